@@ -16,6 +16,8 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler
 from sklearn.neighbors import NearestNeighbors
 
+from rec_system.cosine_index import CosineIndex
+
 NUMERIC_COLS = ["product_price", "product_star_rating", "product_num_ratings"]
 
 def build_features(df: pd.DataFrame):
@@ -52,10 +54,14 @@ def main():
     knn = NearestNeighbors(n_neighbors=args.neighbors, metric="cosine")
     knn.fit(X)
 
+    # Pre-normalized CSR for the exact cosine engine used at serving time
+    index = CosineIndex(X)
+
     # --- Save artifacts ---
     joblib.dump(tfidf, out_dir / "tfidf.joblib")
     joblib.dump(scaler, out_dir / "scaler.joblib")
     joblib.dump(knn, out_dir / "knn.joblib")
+    joblib.dump(index, out_dir / "cosine_index.joblib")
 
     # Save lookup table (to align ASINs with KNN index)
     keep = ["asin","product_title","product_price","product_star_rating",
@@ -67,7 +73,8 @@ def main():
     (out_dir / "meta.json").write_text(json.dumps({
         "neighbors": args.neighbors,
         "numeric_cols": NUMERIC_COLS,
-        "metric": "cosine"
+        "metric": "cosine",
+        "index": "cosine_index.joblib"
     }, indent=2))
 
     print(f"Built KNN on {len(df)} products. Artifacts saved in {out_dir}")
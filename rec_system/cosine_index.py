@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from scipy.sparse import csr_matrix
+
+def _l2_normalize(X) -> csr_matrix:
+	# Row-wise L2 scaling like sklearn.preprocessing.normalize, without
+	# importing sklearn (keeps `import rec_system.recommender` light)
+	X = csr_matrix(X, dtype=np.float64, copy=True)
+	norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+	norms[norms == 0] = 1.0  # all-zero rows stay zero
+	X.data /= np.repeat(norms, np.diff(X.indptr))
+	return X
+
+class CosineIndex:
+	"""
+	Exact cosine top-k search over a pre-normalized CSR matrix.
+
+	Rows (and the transpose used for scoring) are L2-normalized once at
+	build time, so a query is one sparse dot product plus an argpartition.
+	Distances and ordering mirror NearestNeighbors(metric="cosine").
+	"""
+
+	def __init__(self, X, prenormalized: bool = False):
+		if prenormalized:
+			self.X = X  # taken as-is so shard views stay views
+		else:
+			self.X = _l2_normalize(X)
+		self.X_T = self.X.T.tocsr()
+
+	@property
+	def n_samples(self) -> int:
+		return self.X.shape[0]
+
+	def row(self, i: int):
+		"""Normalized row i as a 1 x n_features CSR matrix."""
+		return self.X[i]
+
+	def distances(self, Xq) -> np.ndarray:
+		"""Dense (n_queries, n_samples) cosine distances, clipped to [0, 2]."""
+		return self._distances(_l2_normalize(Xq))
+
+	def _distances(self, Xq) -> np.ndarray:
+		sim = (Xq @ self.X_T).toarray()
+		dist = 1.0 - sim
+		np.clip(dist, 0, 2, out=dist)
+		return dist
+
+	def kneighbors(
+		self,
+		Xq,
+		n_neighbors: int,
+		mask: Optional[np.ndarray] = None,
+	) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Return (distances, indices) of the n_neighbors closest rows per query.
+		If mask is given (bool array of length n_samples), only rows where it
+		is True are candidates; n_neighbors is capped at the candidate count.
+		"""
+		return self._kneighbors(_l2_normalize(Xq), n_neighbors, mask)
+
+	def _kneighbors(self, Xq, n_neighbors, mask):
+		dist = self._distances(Xq)
+
+		n_candidates = self.n_samples
+		if mask is not None:
+			mask = np.asarray(mask, dtype=bool)
+			if mask.shape != (self.n_samples,):
+				raise ValueError(f"mask must have shape ({self.n_samples},), got {mask.shape}")
+			dist[:, ~mask] = np.inf
+			n_candidates = int(mask.sum())
+
+		k = min(int(n_neighbors), n_candidates)
+		rows = np.arange(dist.shape[0])[:, None]
+		if k <= 0:
+			empty = np.empty((dist.shape[0], 0))
+			return empty, empty.astype(np.intp)
+
+		# Same selection as sklearn's brute-force reduce step
+		inds = np.argpartition(dist, k - 1, axis=1)[:, :k]
+		inds = inds[rows, np.argsort(dist[rows, inds], axis=1)]
+		return dist[rows, inds], inds
+
+def _row_view(X, start: int, stop: int) -> csr_matrix:
+	# Unlike X[start:stop], shares data/indices with X instead of copying them
+	lo, hi = X.indptr[start], X.indptr[stop]
+	return csr_matrix(
+		(X.data[lo:hi], X.indices[lo:hi], X.indptr[start:stop + 1] - lo),
+		shape=(stop - start, X.shape[1]),
+		copy=False,
+	)
+
+class ShardedCosineIndex:
+	"""
+	Scatter-gather wrapper around a CosineIndex.
+
+	The normalized rows are split into contiguous shards served by a
+	persistent thread pool (the sparse product and argpartition release
+	the GIL). Each query batch goes to every shard and the per-shard
+	top-k blocks are merged with one more argpartition.
+
+	Shard rows are views into the source matrix, so only the per-shard
+	transposes add memory (about what the unsharded X_T costs).
+	"""
+
+	def __init__(self, index: CosineIndex, n_workers: Optional[int] = None, n_shards: Optional[int] = None):
+		self.n_workers = max(1, n_workers or os.cpu_count() or 1)
+		n = index.n_samples
+		n_shards = max(1, min(n_shards or self.n_workers, n))
+
+		self._n_samples = n
+		self.bounds = np.linspace(0, n, n_shards + 1).astype(int)
+		self.shards: List[CosineIndex] = [
+			CosineIndex(_row_view(index.X, start, stop), prenormalized=True)
+			for start, stop in zip(self.bounds[:-1], self.bounds[1:])
+		]
+		self._pool = ThreadPoolExecutor(max_workers=self.n_workers, thread_name_prefix="cosine-shard")
+
+	@property
+	def n_samples(self) -> int:
+		return self._n_samples
+
+	def row(self, i: int):
+		s = int(np.searchsorted(self.bounds, i, side="right")) - 1
+		return self.shards[s].row(i - self.bounds[s])
+
+	def close(self) -> None:
+		self._pool.shutdown(wait=True)
+
+	def kneighbors(
+		self,
+		Xq,
+		n_neighbors: int,
+		mask: Optional[np.ndarray] = None,
+	) -> Tuple[np.ndarray, np.ndarray]:
+		"""Same contract as CosineIndex.kneighbors."""
+		Xq = _l2_normalize(Xq)
+		if mask is not None:
+			mask = np.asarray(mask, dtype=bool)
+			if mask.shape != (self.n_samples,):
+				raise ValueError(f"mask must have shape ({self.n_samples},), got {mask.shape}")
+			n_candidates = int(mask.sum())
+		else:
+			n_candidates = self.n_samples
+		k = max(0, min(int(n_neighbors), n_candidates))
+
+		# Scatter: every shard computes its own top-k
+		futures = []
+		for shard, start, stop in zip(self.shards, self.bounds[:-1], self.bounds[1:]):
+			shard_mask = None if mask is None else mask[start:stop]
+			futures.append(self._pool.submit(shard._kneighbors, Xq, k, shard_mask))
+		parts = [f.result() for f in futures]
+
+		# Gather: concatenate the per-shard blocks (k * n_shards columns at
+		# most, shifted to global ids) and select the top-k once more
+		dists = np.hstack([d for d, _ in parts])
+		inds = np.hstack([i + start for (_, i), start in zip(parts, self.bounds[:-1])])
+		if k == 0:
+			return dists, inds
+
+		rows = np.arange(dists.shape[0])[:, None]
+		top = np.argpartition(dists, k - 1, axis=1)[:, :k]
+		top = top[rows, np.argsort(dists[rows, top], axis=1)]
+		return dists[rows, top], inds[rows, top]
@@ -1,2 +1,228 @@
+'''
+Refresh pipeline: (clean -> build KNN index) | ingest raw CSV into DB
+Instructions:
+
+python3 -m rec_system.main --out_dir app/models
+python3 -m rec_system.main --force            # rerun every stage
+python3 -m rec_system.main --skip_ingest      # index only
+
+Each stage is fingerprinted from the content of its input files, its
+source code and its parameters. A stage whose fingerprint matches the last
+successful run (and whose outputs still exist) is skipped. Ingest reads the
+raw CSV (the cleaner's median imputation is only for KNN features), so it
+runs in parallel with clean and build. Fingerprints and timings are
+recorded under "pipeline" in <out_dir>/meta.json; a stage that fails loses
+its record, so it always reruns next time.
+'''
+
+from __future__ import annotations
+
+import argparse
+
+import hashlib
+
+import json
+
+import subprocess
+
+import sys
+
+import time
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from dataclasses import dataclass, field
+
+from datetime import datetime, timezone
+
+from pathlib import Path
+
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# ---------- Stages ----------
+@dataclass
+class Stage:
+	name: str
+	module: str                 # run as `python -m <module> <args>`
+	args: List[str]
+	inputs: List[Path]          # data files, hashed by content
+	sources: List[Path]         # code the stage depends on
+	outputs: List[Path] = field(default_factory=list)
+	params: Dict[str, Any] = field(default_factory=dict)   # fingerprinted, not passed
+	deps: List[str] = field(default_factory=list)
+
+def build_stages(args) -> List[Stage]:
+	# Absolute paths: stages run from the repo root so `-m` imports resolve
+	raw_csv = Path(args.raw_csv).resolve()
+	clean_csv = Path(args.clean_csv).resolve()
+	out_dir = Path(args.out_dir).resolve()
+
+	stages = [
+		Stage(
+			name="clean",
+			module="scripts.data_cleaner",
+			args=["--in_csv", str(raw_csv), "--out_csv", str(clean_csv)],
+			inputs=[raw_csv],
+			sources=[ROOT / "scripts/data_cleaner.py"],
+			outputs=[clean_csv],
+		),
+		Stage(
+			name="build",
+			module="rec_system.build_knn",
+			args=["--in_csv", str(clean_csv), "--out_dir", str(out_dir), "--neighbors", str(args.neighbors)],
+			inputs=[clean_csv],
+			sources=[ROOT / "rec_system/build_knn.py", ROOT / "rec_system/cosine_index.py"],
+			outputs=[out_dir / name for name in (
+				"tfidf.joblib", "scaler.joblib", "knn.joblib", "cosine_index.joblib", "lookup.csv", "meta.json",
+			)],
+			deps=["clean"],
+		),
+	]
+	if not args.skip_ingest:
+		db_path = _db_path()
+		stages.append(Stage(
+			name="ingest",
+			module="scripts.ingest_products",
+			args=["--in_csv", str(raw_csv)],
+			inputs=[raw_csv],
+			sources=[
+				ROOT / "scripts/ingest_products.py",
+				ROOT / "scripts/ingest.py",
+				ROOT / "website/models.py",
+			],
+			outputs=[db_path],
+			params={"db": str(db_path)},
+		))
+	return stages
+
+def _db_path() -> Path:
+	# Same resolution as create_app(): relative sqlite paths live in the
+	# Flask instance folder, which for the `website` package is <repo>/instance
+	from website.config import settings
+
+	path = Path(settings.DB_NAME)
+	return path if path.is_absolute() else ROOT / "instance" / path
+
+# ---------- Fingerprints ----------
+def _file_digest(path: Path) -> str:
+	h = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(1 << 20), b""):
+			h.update(chunk)
+	return h.hexdigest()
+
+def fingerprint(stage: Stage) -> str:
+	'''
+	Hash of input contents, stage source code and parameters.
+	Computed right before the stage runs, so upstream outputs are final.
+	'''
+	h = hashlib.sha256()
+	h.update(json.dumps(
+		{"module": stage.module, "args": stage.args, "params": stage.params}, sort_keys=True,
+	).encode())
+	for path in stage.inputs + stage.sources:
+		h.update(str(path).encode())
+		h.update(_file_digest(path).encode() if path.exists() else b"<missing>")
+	return h.hexdigest()
+
+def _load_meta(out_dir: Path) -> Dict[str, Any]:
+	path = out_dir / "meta.json"
+	if path.exists():
+		return json.loads(path.read_text())
+	return {}
+
+# ---------- Execution ----------
+def run_stage(stage: Stage, previous: Dict[str, Any], force: bool) -> Dict[str, Any]:
+	start = time.perf_counter()
+	fp = fingerprint(stage)
+
+	current = (
+		not force
+		and previous.get("fingerprint") == fp
+		and all(p.exists() for p in stage.outputs)
+	)
+	if current:
+		print(f"[{stage.name}] up to date, skipping")
+		# Keep the last real run's "seconds"; the check itself is timed separately
+		return {**previous, "status": "skipped", "check_seconds": round(time.perf_counter() - start, 3)}
+
+	print(f"[{stage.name}] running {stage.module}")
+	proc = subprocess.run([sys.executable, "-m", stage.module, *stage.args], cwd=ROOT)
+	if proc.returncode != 0:
+		raise RuntimeError(f"Stage '{stage.name}' failed with exit code {proc.returncode}")
+
+	seconds = round(time.perf_counter() - start, 3)
+	print(f"[{stage.name}] done in {seconds:.2f}s")
+	return {
+		"fingerprint": fp,
+		"status": "ran",
+		"seconds": seconds,
+		"finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+	}
+
+def run_pipeline(stages: List[Stage], out_dir: Path, force: bool = False, workers: int = 2) -> Dict[str, Any]:
+	previous = _load_meta(out_dir).get("pipeline", {})
+	records: Dict[str, Any] = {}
+	failed: Dict[str, Exception] = {}
+	pending = list(stages)
+	running: Dict[Future, str] = {}
+
+	try:
+		with ThreadPoolExecutor(max_workers=workers) as pool:
+			while pending or running:
+				# Start every stage whose dependencies have all completed;
+				# after a failure only the stages already running finish
+				if not failed:
+					for stage in [s for s in pending if all(d in records for d in s.deps)]:
+						pending.remove(stage)
+						running[pool.submit(run_stage, stage, previous.get(stage.name, {}), force)] = stage.name
+				if not running:
+					break
+
+				done, _ = wait(running, return_when=FIRST_COMPLETED)
+				for fut in done:
+					name = running.pop(fut)
+					try:
+						records[name] = fut.result()
+					except Exception as e:
+						failed[name] = e
+	finally:
+		# build_knn rewrites meta.json, so merge the records in only once
+		# no stage subprocess is running anymore. A failed stage may have
+		# left partial outputs, so its old fingerprint must not be trusted.
+		out_dir.mkdir(parents=True, exist_ok=True)
+		meta = _load_meta(out_dir)
+		kept = {name: rec for name, rec in previous.items() if name not in failed}
+		meta["pipeline"] = {**kept, **records}
+		(out_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+
+	if failed:
+		raise RuntimeError("; ".join(str(e) for e in failed.values()))
+	return records
+
 def main():
-	pass
\ No newline at end of file
+	parser = argparse.ArgumentParser(description="Clean -> ingest -> build pipeline with stage caching")
+	parser.add_argument("--raw_csv", default="data/Amazon_bestsellers_items_2025.csv")
+	parser.add_argument("--clean_csv", default="data/amazon_bestsellers_clean.csv")
+	parser.add_argument("--out_dir", default="app/models")
+	parser.add_argument("--neighbors", type=int, default=50)
+	parser.add_argument("--skip_ingest", action="store_true", help="Only refresh the index, not the DB")
+	parser.add_argument("--force", action="store_true", help="Rerun stages even if up to date")
+	parser.add_argument("--workers", type=int, default=2, help="Stages allowed to run at once")
+	args = parser.parse_args()
+
+	out_dir = Path(args.out_dir).resolve()
+	start = time.perf_counter()
+	try:
+		records = run_pipeline(build_stages(args), out_dir, force=args.force, workers=args.workers)
+	except RuntimeError as e:
+		raise SystemExit(str(e))
+
+	ran = [name for name, r in records.items() if r["status"] == "ran"]
+	print(f"Pipeline finished in {time.perf_counter() - start:.2f}s "
+		f"(ran: {', '.join(ran) or 'nothing'}). Timings in {out_dir / 'meta.json'}")
+
+if __name__ == "__main__":
+	main()
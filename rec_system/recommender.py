@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from website.config import settings
+import atexit
 
 import os
 
@@ -18,16 +18,21 @@ import pandas as pd
 
 from scipy.sparse import hstack
 
+from rec_system.cosine_index import CosineIndex, ShardedCosineIndex
+
 # ---------- Config ----------
 MODEL_DIR = Path(os.getenv("MODEL_DIR", "app/models")).resolve()
 LOOKUP_CSV = MODEL_DIR / "lookup.csv"   # produced by build_knn.py
+INDEX_PATH = MODEL_DIR / "cosine_index.joblib"   # produced by build_knn.py
+DEFAULT_K = int(os.getenv("DEFAULT_K", "10"))
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", "1"))   # >1 shards the index over a thread pool
 
 # ---------- Internal state ----------
 @dataclass
 class _State:
 	tfidf: Any
 	scaler: Any
-	knn: Any
+	index: CosineIndex | ShardedCosineIndex
 	lookup: pd.DataFrame  # same row order used during training
 
 _STATE: Optional[_State] = None
@@ -43,13 +48,23 @@ def _ensure_loaded() -> _State:
 
 	tfidf = joblib.load(MODEL_DIR / "tfidf.joblib")
 	scaler = joblib.load(MODEL_DIR / "scaler.joblib")
-	knn = joblib.load(MODEL_DIR / "knn.joblib")
 
 	# lookup.csv was saved in the same order as training data,
 	# indices must match knn index
 	lookup = pd.read_csv(LOOKUP_CSV)
 
-	_STATE = _State(tfidf=tfidf, scaler=scaler, knn=knn, lookup=lookup)
+	# Older model dirs have no cosine index: re-featurize the lookup rows,
+	# which reproduces the training matrix
+	if INDEX_PATH.exists():
+		index = joblib.load(INDEX_PATH)
+	else:
+		index = CosineIndex(_vectorize_rows(lookup, tfidf, scaler))
+
+	if INDEX_WORKERS > 1:
+		index = ShardedCosineIndex(index, n_workers=INDEX_WORKERS)
+		atexit.register(index.close)
+
+	_STATE = _State(tfidf=tfidf, scaler=scaler, index=index, lookup=lookup)
 	return _STATE
 
 # ---------- Featurization (must mirror training) ----------
@@ -80,7 +95,7 @@ def _vectorize_rows(df_rows: pd.DataFrame, tfidf, scaler):
 	# Combine (sparse text + dense numeric)
 	return hstack([X_text, X_num]).tocsr()
 
-def recommend(asin: str, k: int = settings.DEFAULT_K, same_country: bool = False) -> List[Dict[str, Any]]:
+def recommend(asin: str, k: int = DEFAULT_K, same_country: bool = False) -> List[Dict[str, Any]]:
 	"""
 	Return up to k similar products for a given ASIN.
 	If same_country=True, only return neighbors from the same country as the seed item.
@@ -96,38 +111,21 @@ def recommend(asin: str, k: int = settings.DEFAULT_K, same_country: bool = False
 	seed_row = lk.iloc[[idx]].copy()
 	seed_country = seed_row["country"].iloc[0] if "country" in seed_row.columns else None
 
-	Xq = _vectorize_rows(seed_row, st.tfidf, st.scaler)
-
-	# +1 because the first neighbor will be the item itself
-	dists, inds = st.knn.kneighbors(Xq, n_neighbors=min(k + 1, len(lk)))
-	cand_idxs = [i for i in inds[0].tolist() if i != idx]
+	# The seed's training row is already in the index, no need to re-featurize
+	Xq = st.index.row(idx)
 
-	# Optional same-country filter
+	# Candidates: everything but the seed, optionally same-country only
+	cand = np.ones(len(lk), dtype=bool)
+	cand[idx] = False
 	if same_country and "country" in lk.columns and seed_country is not None:
-		cand_idxs = [i for i in cand_idxs if lk.iloc[i]["country"] == seed_country]
+		cand &= (lk["country"] == seed_country).to_numpy()
 
-	# Truncate to k after filtering
-	cand_idxs = cand_idxs[:k]
-	cand_dists = []
-	# distances array corresponds to the original order; skip self and align
-	for i, d in zip(inds[0].tolist(), dists[0].tolist()):
-		if i != idx and i in cand_idxs:
-			cand_dists.append(d)
+	dists, inds = st.index.kneighbors(Xq, n_neighbors=k, mask=cand)
 
-	recs = lk.iloc[cand_idxs].copy()
+	recs = lk.iloc[inds[0].tolist()].copy()
 	# similarity = 1 - cosine_distance
 	# (cosine distance ∈ [0, 2], but in practice with TF-IDF it's [0, 1])
-	# Align lengths defensively:
-	sim = [1.0 - float(d) for d in cand_dists]
-	# If lengths mismatch due to filtering order, recompute per-row (safe but a tad slower)
-	if len(sim) != len(recs):
-		# Recompute one-by-one to be safe
-		sim = []
-		for i in cand_idxs:
-			Xi = _vectorize_rows(lk.iloc[[i]], st.tfidf, st.scaler)
-			d, _ = st.knn.kneighbors(Xi, n_neighbors=1)
-			sim.append(1.0 - float(d[0][0]))
-	recs = recs.assign(similarity=sim)
+	recs = recs.assign(similarity=[1.0 - float(d) for d in dists[0].tolist()])
 
 	# Final shape / keys
 	cols = [
@@ -152,7 +150,7 @@ def recommend_adhoc(
 	product_star_rating: float | None = None,
 	product_num_ratings: float | None = None,
 	country: str | None = None,
-	k: int = settings.DEFAULT_K,
+	k: int = DEFAULT_K,
 ) -> List[Dict[str, Any]]:
 	"""
 	Recommend similar products for an item that is NOT in the index.
@@ -168,7 +166,7 @@ def recommend_adhoc(
 	}
 	df_row = pd.DataFrame([payload])
 	Xq = _vectorize_rows(df_row, st.tfidf, st.scaler)
-	dists, inds = st.knn.kneighbors(Xq, n_neighbors=min(k, len(st.lookup)))
+	dists, inds = st.index.kneighbors(Xq, n_neighbors=k)
 	recs = st.lookup.iloc[inds[0].tolist()].copy()
 	recs["similarity"] = [1.0 - float(d) for d in dists[0].tolist()]
 
@@ -195,7 +193,7 @@ if __name__ == "__main__":
 
 	parser = argparse.ArgumentParser(description="KNN Similarity Recommender (local)")
 	parser.add_argument("--asin", type=str, help="ASIN to query (must exist in lookup.csv)")
-	parser.add_argument("--k", type=int, default=settings.DEFAULT_K)
+	parser.add_argument("--k", type=int, default=DEFAULT_K)
 	parser.add_argument("--same_country", action="store_true")
 	parser.add_argument("--title", type=str, help="Ad-hoc title (if ASIN not provided)")
 	parser.add_argument("--price", type=float, default=None)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import csv
+
+import heapq
+
+import os
+
+import re
+
+from bisect import bisect_left
+
+from pathlib import Path
+
+from typing import List, Dict, Optional, Tuple
+
+# Stdlib only on purpose: the web app serves this without loading pandas/sklearn
+
+# ---------- Config ----------
+MODEL_DIR = Path(os.getenv("MODEL_DIR", "app/models")).resolve()
+LOOKUP_CSV = MODEL_DIR / "lookup.csv"   # produced by build_knn.py
+
+_TOKEN_RE = re.compile(r"\w+")
+_SHORT_PREFIX = 3   # prefixes up to this length are precomputed, longer ones use the sorted vocab
+MIN_QUERY_CHARS = 2   # shorter queries match most of the catalog; the form waits for 2 too
+
+def _tokenize(text: str) -> List[str]:
+	return _TOKEN_RE.findall(str(text).lower())
+
+def _to_float(x) -> float:
+	try:
+		return float(x)
+	except (TypeError, ValueError):
+		return 0.0
+
+def _contains(ids: Tuple[int, ...], i: int) -> bool:
+	j = bisect_left(ids, i)
+	return j < len(ids) and ids[j] == i
+
+class TitleIndex:
+	"""
+	In-memory prefix / inverted index over product titles.
+	Every query token is treated as a word prefix; results contain all of them
+	and are ordered by number of ratings, one entry per ASIN.
+
+	Item ids are assigned in popularity order, so every posting list is
+	sorted best-first and a search stops as soon as it has `limit` hits.
+	"""
+
+	def __init__(self, rows: List[Dict[str, str]]):
+		items: List[Dict[str, str]] = []
+		popularity: List[float] = []
+		seen = set()
+		for row in rows:
+			asin = str(row.get("asin") or "").strip()
+			if not asin or asin in seen:
+				continue  # recommend(asin) uses the first occurrence too
+			seen.add(asin)
+			items.append({
+				"asin": asin,
+				"product_title": row.get("product_title") or "",
+				"country": row.get("country") or "",
+			})
+			popularity.append(_to_float(row.get("product_num_ratings")))
+
+		# Most reviewed first (stable, so ties keep file order)
+		order = sorted(range(len(items)), key=lambda i: -popularity[i])
+		self.items = [items[i] for i in order]
+
+		postings: Dict[str, List[int]] = {}
+		for i, item in enumerate(self.items):
+			for tok in dict.fromkeys(_tokenize(item["product_title"])):
+				postings.setdefault(tok, []).append(i)  # ascending ids
+
+		self.vocab = sorted(postings)
+		self.postings = [tuple(postings[t]) for t in self.vocab]
+
+		short: Dict[str, set] = {}
+		for tok, ids in postings.items():
+			for n in range(1, min(len(tok), _SHORT_PREFIX) + 1):
+				short.setdefault(tok[:n], set()).update(ids)
+		self.short = {p: tuple(sorted(ids)) for p, ids in short.items()}
+
+	@classmethod
+	def from_csv(cls, path: Path) -> "TitleIndex":
+		with open(path, newline="", encoding="utf-8") as f:
+			return cls(list(csv.DictReader(f)))
+
+	def _match_prefix(self, prefix: str) -> List[Tuple[int, ...]]:
+		# Sorted posting lists whose union is every item with a word starting with prefix
+		if len(prefix) <= _SHORT_PREFIX:
+			ids = self.short.get(prefix)
+			return [ids] if ids else []
+		lo = bisect_left(self.vocab, prefix)
+		hi = bisect_left(self.vocab, prefix + "\uffff")
+		return self.postings[lo:hi]
+
+	def search(self, query: str, limit: int = 10) -> List[Dict[str, str]]:
+		tokens = _tokenize(query)
+		if not tokens or limit <= 0:
+			return []
+
+		groups = [self._match_prefix(t) for t in dict.fromkeys(tokens)]
+		if not all(groups):
+			return []
+
+		# Walk the smallest group best-first, probe the others by bisection
+		groups.sort(key=lambda g: sum(map(len, g)))
+		driver, others = groups[0], groups[1:]
+		candidates = driver[0] if len(driver) == 1 else heapq.merge(*driver)
+
+		hits: List[int] = []
+		last = -1
+		for i in candidates:
+			if i == last:
+				continue  # same item under two words of the driver prefix
+			last = i
+			if all(any(_contains(ids, i) for ids in g) for g in others):
+				hits.append(i)
+				if len(hits) == limit:
+					break
+		return [dict(self.items[i]) for i in hits]
+
+# ---------- Internal state ----------
+_INDEX: Optional[TitleIndex] = None
+
+def _ensure_loaded() -> TitleIndex:
+	global _INDEX
+	if _INDEX is not None:
+		return _INDEX
+
+	if not LOOKUP_CSV.exists():
+		raise FileNotFoundError(f"lookup.csv not found: {LOOKUP_CSV}")
+
+	_INDEX = TitleIndex.from_csv(LOOKUP_CSV)
+	return _INDEX
+
+def suggest(query: str, limit: int = 10) -> List[Dict[str, str]]:
+	"""
+	Return up to `limit` known products whose title words start with every
+	token of `query`, e.g. "kasp sec" -> Kaspersky ... Security.
+	Queries shorter than MIN_QUERY_CHARS return nothing.
+	"""
+	if len(query.strip()) < MIN_QUERY_CHARS:
+		return []
+	return _ensure_loaded().search(query, limit=limit)
@@ -0,0 +1,109 @@
+'''
+Query throughput of NearestNeighbors vs CosineIndex vs ShardedCosineIndex
+on a synthetic catalog
+Instructions:
+
+python3 -m scripts.bench_index --rows 1000000 --workers 1 2 4 8
+
+Rows mimic build_knn features: sparse TF-IDF-like text columns plus a few
+dense numeric ones. Reports queries/sec for the sklearn backend previously
+used for serving, the unsharded index and each worker count, so both the
+latency win and core scaling can be checked on the serving host.
+
+--gil_probe checks, even on a single core, that shard work releases the
+GIL: a pure-Python counter thread runs while the main thread queries. Its
+share of its idle rate is about 1/2 on one core when the work releases the
+GIL (the OS splits the core) and near 0 for a GIL-holding C call.
+'''
+
+import os
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from scipy.sparse import hstack, random as sparse_random
+
+from sklearn.neighbors import NearestNeighbors
+
+from rec_system.cosine_index import CosineIndex, ShardedCosineIndex
+
+def make_catalog(rows: int, vocab: int, nnz_per_row: int, seed: int):
+	rng = np.random.default_rng(seed)
+	X_text = sparse_random(rows, vocab, density=nnz_per_row / vocab, format="csr", random_state=rng)
+	X_num = rng.standard_normal((rows, 3))
+	return hstack([X_text, X_num]).tocsr()
+
+def throughput(index, queries, k: int, batch: int) -> float:
+	index.kneighbors(queries[:batch], n_neighbors=k)  # warm-up
+	start = time.perf_counter()
+	for lo in range(0, queries.shape[0], batch):
+		index.kneighbors(queries[lo:lo + batch], n_neighbors=k)
+	return queries.shape[0] / (time.perf_counter() - start)
+
+def counter_share(work, seconds: float = 2.0) -> float:
+	# Progress of a pure-Python counter thread while `work` loops, relative to idle
+	def run(fn):
+		stop = threading.Event()
+		count = [0]
+
+		def spin():
+			while not stop.is_set():
+				count[0] += 1
+
+		t = threading.Thread(target=spin)
+		t.start()
+		start = time.perf_counter()
+		while time.perf_counter() - start < seconds:
+			fn()
+		stop.set()
+		t.join()
+		return count[0]
+
+	return run(work) / run(lambda: time.sleep(0.01))
+
+def gil_probe(index, query, k: int):
+	print("  GIL probe (counter thread share: ~0.5 on 1 core = released, ~0 = held)")
+	print(f"    sum(range) control   {counter_share(lambda: sum(range(3_000_000))):.2f}")
+	print(f"    CosineIndex query    {counter_share(lambda: index.kneighbors(query, n_neighbors=k)):.2f}")
+
+def main():
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--rows", type=int, default=1_000_000)
+	ap.add_argument("--vocab", type=int, default=50_000)
+	ap.add_argument("--nnz_per_row", type=int, default=20)
+	ap.add_argument("--queries", type=int, default=64)
+	ap.add_argument("--batch", type=int, default=1, help="Queries per kneighbors call")
+	ap.add_argument("--k", type=int, default=10)
+	ap.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+	ap.add_argument("--seed", type=int, default=0)
+	ap.add_argument("--gil_probe", action="store_true", help="Also check that queries release the GIL")
+	args = ap.parse_args()
+
+	X = make_catalog(args.rows, args.vocab, args.nnz_per_row, args.seed)
+	queries = X[:args.queries]
+	base = CosineIndex(X)
+	print(f"{args.rows} rows, {X.nnz} non-zeros, {os.cpu_count()} cores")
+
+	knn = NearestNeighbors(n_neighbors=args.k, metric="cosine").fit(X)
+	qps_sk = throughput(knn, queries, args.k, args.batch)
+	print(f"  sklearn        {qps_sk:10.1f} q/s")
+	del knn
+
+	qps_1 = throughput(base, queries, args.k, args.batch)
+	print(f"  unsharded      {qps_1:10.1f} q/s  ({qps_1 / qps_sk:.2f}x sklearn)")
+
+	if args.gil_probe:
+		gil_probe(base, queries[:1], args.k)
+
+	for n in sorted(set(args.workers)):
+		sharded = ShardedCosineIndex(base, n_workers=n)
+		try:
+			qps = throughput(sharded, queries, args.k, args.batch)
+		finally:
+			sharded.close()
+		print(f"  {n:3d} workers    {qps:10.1f} q/s  ({qps / qps_1:.2f}x)")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,141 @@
+'''
+Import-time budget check for app and CLI startup
+Instructions:
+
+python3 scripts/import_budget.py --record      # measure and save the baseline
+python3 scripts/import_budget.py               # check against it
+python3 scripts/import_budget.py --target app --budget_ms 400 --top 15
+
+Runs each target under `python -X importtime` in a fresh interpreter,
+prints the slowest imports and fails if a target imports a module it must
+not (e.g. the scientific stack for the web app), fails to import, or is
+slower than its budget. The budget is the recorded baseline (median of
+--runs measurements) times --tolerance; timings are host-specific, so
+record the baseline on the machine that runs the check.
+'''
+
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_JSON = Path(__file__).resolve().parent / "import_baseline.json"
+
+# name -> (statement, modules that must not be imported)
+TARGETS = {
+	"app": (
+		"import website.views, website.auth",
+		["pandas", "scipy", "sklearn", "joblib", "rec_system"],
+	),
+	"cli": (
+		"import rec_system.recommender",
+		["website", "flask", "pydantic_settings", "dotenv", "sklearn"],
+	),
+}
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def parse_importtime(stderr: str):
+	'''
+	Parse `-X importtime` output into (module, self_us, cumulative_us, depth) rows
+	'''
+	rows = []
+	for line in stderr.splitlines():
+		m = LINE_RE.match(line)
+		if not m:
+			continue
+		self_us, cum_us, indent, name = m.groups()
+		rows.append((name, int(self_us), int(cum_us), (len(indent) - 1) // 2))
+	return rows
+
+def measure(statement: str):
+	proc = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", statement],
+		cwd=ROOT,
+		capture_output=True,
+		text=True,
+		env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+	)
+	if proc.returncode != 0:
+		tail = "\n".join(proc.stderr.strip().splitlines()[-5:])
+		raise RuntimeError(f"`{statement}` failed:\n{tail}")
+	return parse_importtime(proc.stderr)
+
+def total_ms(rows) -> float:
+	# Top-level imports (depth 0) add up to the total startup cost
+	return sum(cum for _, _, cum, depth in rows if depth == 0) / 1000
+
+def leaked_modules(rows, forbidden):
+	'''
+	Forbidden top-level packages that show up (directly or via a submodule)
+	'''
+	loaded = {mod for mod, _, _, _ in rows}
+	return sorted(
+		f for f in forbidden
+		if any(mod == f or mod.startswith(f + ".") for mod in loaded)
+	)
+
+def report(name: str, rows, budget_ms, forbidden, top: int) -> bool:
+	total = total_ms(rows)
+	leaked = leaked_modules(rows, forbidden)
+
+	budget = f"budget {budget_ms:.0f} ms" if budget_ms else "no baseline recorded"
+	print(f"[{name}] total {total:.1f} ms ({budget}), {len(rows)} modules")
+	for mod, self_us, cum_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+		print(f"  {cum_us / 1000:8.1f} ms cumulative {self_us / 1000:8.1f} ms self  {mod}")
+
+	ok = True
+	if budget_ms and total > budget_ms:
+		print(f"  FAIL: over budget by {total - budget_ms:.1f} ms")
+		ok = False
+	if leaked:
+		print(f"  FAIL: imported forbidden modules: {', '.join(leaked)}")
+		ok = False
+	return ok
+
+def main():
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--target", choices=sorted(TARGETS), action="append", help="Target(s) to check (default: all)")
+	ap.add_argument("--record", action="store_true", help=f"Save the measured medians to {BASELINE_JSON.name}")
+	ap.add_argument("--runs", type=int, default=5, help="Measurements per target; the median is used")
+	ap.add_argument("--tolerance", type=float, default=1.25, help="Budget = baseline x tolerance")
+	ap.add_argument("--budget_ms", type=float, default=None, help="Override the budget for every selected target")
+	ap.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+	args = ap.parse_args()
+
+	baseline = json.loads(BASELINE_JSON.read_text()) if BASELINE_JSON.exists() else {}
+
+	ok = True
+	for name in args.target or sorted(TARGETS):
+		statement, forbidden = TARGETS[name]
+		try:
+			runs = [measure(statement) for _ in range(max(1, args.runs))]
+		except RuntimeError as e:
+			print(f"[{name}] FAIL: {e}")
+			ok = False
+			continue
+
+		# Report the median run
+		runs.sort(key=total_ms)
+		rows = runs[len(runs) // 2]
+		median_ms = statistics.median(total_ms(r) for r in runs)
+
+		if args.record:
+			baseline[name] = round(median_ms, 1)
+		budget_ms = args.budget_ms or (baseline[name] * args.tolerance if name in baseline else None)
+		ok &= report(name, rows, budget_ms, forbidden, args.top)
+
+	if args.record:
+		BASELINE_JSON.write_text(json.dumps(baseline, indent=2) + "\n")
+		print(f"Baseline saved to {BASELINE_JSON}")
+
+	sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+	main()
@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 
 from website import create_app, db
@@ -5,10 +7,14 @@ from website.models import Product
 from .ingest import normalize_csv_data, upsert_into_db
 
 def main():
+	ap = argparse.ArgumentParser()
+	ap.add_argument("--in_csv", default="data/Amazon_bestsellers_items_2025.csv", help="Products CSV to upsert")
+	args = ap.parse_args()
+
 	app = create_app()
 
 	with app.app_context():
-		df = pd.read_csv("data/Amazon_bestsellers_items_2025.csv")
+		df = pd.read_csv(args.in_csv)
 
 		df_normalized = normalize_csv_data(df)
 
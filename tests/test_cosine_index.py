@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from sklearn.metrics.pairwise import cosine_distances
+from sklearn.neighbors import NearestNeighbors
+
+from rec_system.build_knn import build_features
+from rec_system.cosine_index import CosineIndex, ShardedCosineIndex, _l2_normalize
+
+CLEAN_CSV = Path(__file__).resolve().parent.parent / "data/amazon_bestsellers_clean.csv"
+K = 10
+
+@pytest.fixture(scope="module")
+def features():
+	df = pd.read_csv(CLEAN_CSV).dropna(subset=["asin", "product_title"]).reset_index(drop=True)
+	X, _, _ = build_features(df)
+	knn = NearestNeighbors(n_neighbors=K, metric="cosine").fit(X)
+	return df, X, knn
+
+def _assert_same_neighbors(dists, inds, ref_dists, ref_inds, ref_full):
+	np.testing.assert_allclose(dists, ref_dists, atol=1e-10)
+	# Indices may only differ between rows at tied distances
+	np.testing.assert_allclose(np.take_along_axis(ref_full, inds, axis=1), dists, atol=1e-10)
+	assert inds.shape == ref_inds.shape
+
+def test_l2_normalize_matches_sklearn(features):
+	from scipy.sparse import vstack
+	from sklearn.preprocessing import normalize
+
+	_, X, _ = features
+	X = vstack([X[:50], X[:1] * 0]).tocsr()  # include an all-zero row
+	np.testing.assert_allclose(_l2_normalize(X).toarray(), normalize(X).toarray(), atol=1e-15)
+
+def test_matches_sklearn(features):
+	_, X, knn = features
+	index = CosineIndex(X)
+	Xq = X[:25]
+
+	ref_dists, ref_inds = knn.kneighbors(Xq, n_neighbors=K)
+	ref_full = cosine_distances(Xq, X)
+
+	dists, inds = index.kneighbors(Xq, n_neighbors=K)
+	_assert_same_neighbors(dists, inds, ref_dists, ref_inds, ref_full)
+
+def test_mask_matches_filtered_sklearn(features):
+	df, X, knn = features
+	index = CosineIndex(X)
+	seed = 0
+	mask = (df["country"] == df["country"].iloc[seed]).to_numpy().copy()
+	mask[seed] = False
+
+	full_dists, full_inds = knn.kneighbors(X[seed], n_neighbors=X.shape[0])
+	keep = mask[full_inds[0]]
+	ref_dists = full_dists[:, keep][:, :K]
+	ref_inds = full_inds[:, keep][:, :K]
+	ref_full = cosine_distances(X[seed], X)
+
+	dists, inds = index.kneighbors(X[seed], n_neighbors=K, mask=mask)
+	assert mask[inds[0]].all()
+	_assert_same_neighbors(dists, inds, ref_dists, ref_inds, ref_full)
+
+def test_mask_caps_k(features):
+	_, X, _ = features
+	mask = np.zeros(X.shape[0], dtype=bool)
+	mask[[3, 7]] = True
+
+	dists, inds = CosineIndex(X).kneighbors(X[0], n_neighbors=K, mask=mask)
+	assert sorted(inds[0].tolist()) == [3, 7]
+	assert dists.shape == (1, 2)
+
+def test_sharded_matches_unsharded(features):
+	df, X, _ = features
+	index = CosineIndex(X)
+	sharded = ShardedCosineIndex(index, n_workers=3)
+	try:
+		Xq = X[:25]
+		dists, inds = sharded.kneighbors(Xq, n_neighbors=K)
+		ref_dists, ref_inds = index.kneighbors(Xq, n_neighbors=K)
+		np.testing.assert_allclose(dists, ref_dists, atol=1e-12)
+		np.testing.assert_allclose(np.take_along_axis(index.distances(Xq), inds, axis=1), dists, atol=1e-12)
+
+		mask = (df["country"] == df["country"].iloc[0]).to_numpy()
+		dists, inds = sharded.kneighbors(X[0], n_neighbors=K, mask=mask)
+		ref_dists, _ = index.kneighbors(X[0], n_neighbors=K, mask=mask)
+		assert mask[inds[0]].all()
+		np.testing.assert_allclose(dists, ref_dists, atol=1e-12)
+
+		# Candidates confined to the first shard: the others contribute nothing
+		mask = np.zeros(X.shape[0], dtype=bool)
+		mask[:5] = True
+		dists, inds = sharded.kneighbors(X[0], n_neighbors=K, mask=mask)
+		assert sorted(inds[0].tolist()) == list(range(5))
+		np.testing.assert_allclose(dists, index.kneighbors(X[0], n_neighbors=K, mask=mask)[0], atol=1e-12)
+
+		for i in (0, X.shape[0] // 2, X.shape[0] - 1):
+			assert (sharded.row(i) != index.row(i)).nnz == 0
+	finally:
+		sharded.close()
@@ -0,0 +1,26 @@
+import pytest
+
+from scripts.import_budget import TARGETS, leaked_modules, measure
+
+# website.config requires these; normally they come from .env
+SETTINGS_ENV = {"DB_NAME": "test.db", "SECRET_KEY": "test", "PORT": "5000", "DEFAULT_K": "10"}
+
+def test_app_startup_skips_scientific_stack(monkeypatch):
+	for mod in ("flask", "flask_login", "flask_sqlalchemy", "pydantic_settings"):
+		pytest.importorskip(mod)
+	for key, value in SETTINGS_ENV.items():
+		monkeypatch.setenv(key, value)
+
+	statement, forbidden = TARGETS["app"]
+	assert leaked_modules(measure(statement), forbidden) == []
+
+def test_cli_startup_skips_web_stack_and_sklearn():
+	for mod in ("numpy", "scipy", "pandas", "joblib"):
+		pytest.importorskip(mod)
+
+	statement, forbidden = TARGETS["cli"]
+	assert leaked_modules(measure(statement), forbidden) == []
+
+def test_leaked_modules_matches_submodules():
+	rows = [("sklearn.utils", 10, 10, 1), ("sklearnish", 5, 5, 0)]
+	assert leaked_modules(rows, ["sklearn", "pandas"]) == ["sklearn"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from rec_system.main import Stage, run_pipeline
+
+# json.tool stands in for the real stage scripts: it copies a JSON file and
+# exits non-zero on invalid input
+
+def make_stages(tmp_path):
+	raw, clean, out = tmp_path / "raw.json", tmp_path / "clean.json", tmp_path / "out"
+	index, db = out / "index.json", tmp_path / "db.json"
+	return [
+		Stage("clean", "json.tool", [str(raw), str(clean)], inputs=[raw], sources=[], outputs=[clean]),
+		Stage("build", "json.tool", [str(clean), str(index)], inputs=[clean], sources=[], outputs=[index], deps=["clean"]),
+		Stage("ingest", "json.tool", [str(raw), str(db)], inputs=[raw], sources=[], outputs=[db], params={"db": str(db)}),
+	]
+
+@pytest.fixture
+def workdir(tmp_path):
+	(tmp_path / "raw.json").write_text('{"a": 1}')
+	(tmp_path / "out").mkdir()
+	return tmp_path
+
+def statuses(records):
+	return {name: rec["status"] for name, rec in records.items()}
+
+def pipeline_meta(workdir):
+	return json.loads((workdir / "out" / "meta.json").read_text())["pipeline"]
+
+def test_runs_in_dependency_order(workdir):
+	# build reads clean's output, which only exists once clean has finished
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert statuses(records) == {"clean": "ran", "build": "ran", "ingest": "ran"}
+	assert json.loads((workdir / "out" / "index.json").read_text()) == {"a": 1}
+
+def test_skips_stages_whose_fingerprint_matches(workdir):
+	run_pipeline(make_stages(workdir), workdir / "out")
+	first = pipeline_meta(workdir)
+
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert set(statuses(records).values()) == {"skipped"}
+	# The last real duration survives a skip
+	assert all(rec["seconds"] == first[name]["seconds"] for name, rec in pipeline_meta(workdir).items())
+	assert all("check_seconds" in rec for rec in pipeline_meta(workdir).values())
+
+def test_reruns_on_input_change(workdir):
+	run_pipeline(make_stages(workdir), workdir / "out")
+	(workdir / "raw.json").write_text('{"a": 2}')
+
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert statuses(records) == {"clean": "ran", "build": "ran", "ingest": "ran"}
+
+def test_unchanged_upstream_output_keeps_downstream_cached(workdir):
+	run_pipeline(make_stages(workdir), workdir / "out")
+	(workdir / "raw.json").write_text('{"a":   1}')  # same JSON, different bytes
+
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert statuses(records) == {"clean": "ran", "build": "skipped", "ingest": "ran"}
+
+def test_reruns_when_output_is_missing(workdir):
+	run_pipeline(make_stages(workdir), workdir / "out")
+	(workdir / "db.json").unlink()
+
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert statuses(records) == {"clean": "skipped", "build": "skipped", "ingest": "ran"}
+
+def test_failure_reports_every_stage_and_invalidates_records(workdir):
+	run_pipeline(make_stages(workdir), workdir / "out")
+	(workdir / "raw.json").write_text("not json")
+
+	with pytest.raises(RuntimeError) as exc:
+		run_pipeline(make_stages(workdir), workdir / "out", force=True)
+	assert "'clean'" in str(exc.value) and "'ingest'" in str(exc.value)
+
+	# Failed stages lose their record; build never started and keeps its own
+	assert set(pipeline_meta(workdir)) == {"build"}
+
+	# Back to the original input: the failed stages must run, not skip
+	(workdir / "raw.json").write_text('{"a": 1}')
+	records = run_pipeline(make_stages(workdir), workdir / "out")
+	assert statuses(records) == {"clean": "ran", "build": "skipped", "ingest": "ran"}
@@ -0,0 +1,52 @@
+from rec_system import typeahead
+from rec_system.typeahead import TitleIndex
+
+ROWS = [
+	{"asin": "A1", "product_title": "Kaspersky Total Security", "country": "IN", "product_num_ratings": "100"},
+	{"asin": "A2", "product_title": "Kaspersky Internet Security", "country": "US", "product_num_ratings": "500"},
+	{"asin": "A3", "product_title": "Norton Security Deluxe", "country": "US", "product_num_ratings": "300"},
+	{"asin": "A1", "product_title": "Kaspersky Total Security (DE)", "country": "DE", "product_num_ratings": "9999"},
+	{"asin": "A4", "product_title": "Microsoft Office Home", "country": "DE", "product_num_ratings": ""},
+	{"asin": "A5", "product_title": "Microphone USB Kit", "country": "UK", "product_num_ratings": "50"},
+]
+
+def asins(results):
+	return [r["asin"] for r in results]
+
+def test_every_token_is_a_prefix_and_all_must_match():
+	index = TitleIndex(ROWS)
+	assert asins(index.search("kasp sec")) == ["A2", "A1"]
+	assert asins(index.search("sec kasp tot")) == ["A1"]
+	assert index.search("kasp deluxe") == []
+
+def test_ordered_by_number_of_ratings():
+	index = TitleIndex(ROWS)
+	assert asins(index.search("security")) == ["A2", "A3", "A1"]
+	assert asins(index.search("s", limit=2)) == ["A2", "A3"]
+
+def test_first_occurrence_of_asin_wins():
+	index = TitleIndex(ROWS)
+	hits = index.search("kaspersky total")
+	assert hits == [{"asin": "A1", "product_title": "Kaspersky Total Security", "country": "IN"}]
+	assert index.search("de") == [{"asin": "A3", "product_title": "Norton Security Deluxe", "country": "US"}]
+
+def test_empty_query_and_zero_limit():
+	index = TitleIndex(ROWS)
+	assert index.search("") == []
+	assert index.search("  !! ") == []
+	assert index.search("kaspersky", limit=0) == []
+	assert TitleIndex([]).search("kaspersky") == []
+
+def test_long_prefix_uses_sorted_vocab():
+	index = TitleIndex(ROWS)
+	# "micro" > _SHORT_PREFIX and spans two vocab words (microsoft, microphone)
+	assert len("micro") > typeahead._SHORT_PREFIX
+	assert asins(index.search("micro")) == ["A5", "A4"]
+	assert asins(index.search("microp")) == ["A5"]
+	assert asins(index.search("micro usb")) == ["A5"]
+	assert index.search("microz") == []
+
+def test_suggest_enforces_minimum_query_length(monkeypatch):
+	monkeypatch.setattr(typeahead, "_INDEX", TitleIndex(ROWS))
+	assert typeahead.suggest("k") == []
+	assert asins(typeahead.suggest("ka")) == ["A2", "A1"]
@@ -1,8 +1,6 @@
 from flask import Blueprint, render_template, request, flash, jsonify
 from flask_login import login_required, current_user
 
-from rec_system.recommender import recommend_adhoc
-
 from .config import settings
 
 # from .models import SearchHistory
@@ -18,26 +16,43 @@ views = Blueprint('views', __name__)
 def home():
 	results = None
 	if request.method == 'POST':
-		name = request.method.get('product-name')
-		price = request.method.get('price', type=float)
-		rating = request.method.get('rating', type=float)
-		country = request.method.get('country')
+		asin = request.form.get('asin')
+		name = request.form.get('product_title')
+		price = request.form.get('product_price', type=float)
+		rating = request.form.get('product_star_rating', type=float)
+		country = request.form.get('country')
 		num_ratings = 0
 
-		results = recommend_adhoc(
-			product_title=name,
-			product_price=price,
-			product_star_rating=rating,
-			country=country,
-			product_num_ratings=num_ratings,
-			k=settings.DEFAULT_K
-		)
+		# Deferred: pulls in pandas/scipy/sklearn and loads the models
+		from rec_system.recommender import recommend, recommend_adhoc
+
+		if asin:
+			# Picked from autocomplete: item is already in the index
+			results = recommend(asin, k=settings.DEFAULT_K)
+		else:
+			results = recommend_adhoc(
+				product_title=name,
+				product_price=price,
+				product_star_rating=rating,
+				country=country,
+				product_num_ratings=num_ratings,
+				k=settings.DEFAULT_K
+			)
 
 		# TODO: record searches
 
 
 	return render_template("home.html", user=current_user, results=results)
 
+@views.route('/autocomplete', methods=['GET'])
+@login_required
+def autocomplete():
+	from rec_system.typeahead import suggest
+
+	query = request.args.get('q', '')
+	limit = min(request.args.get('limit', 10, type=int), 50)
+	return jsonify(suggest(query, limit=limit))
+
 @views.route('/delete-product', methods=['POST'])
 def delete_search_history():
 	# TODO: delete the search history for user